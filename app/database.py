@@ -1,4 +1,11 @@
 import duckdb
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def _connect(db_path: str):
+    # The API never writes, so a read-only connection skips WAL setup
+    return duckdb.connect(db_path, read_only=True)
 
 def get_db_connection(db_path: str = 'duckmart.db'):
-    return duckdb.connect(db_path)
+    # Reuse one connection per database file; each caller gets its own cursor
+    return _connect(db_path).cursor()
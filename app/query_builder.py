@@ -1,96 +1,159 @@
-from typing import List
-from .models import FilterCondition, EventCondition, SegmentationRequest
+from typing import Any, Callable, Dict, List, Optional, Tuple, get_args
+from .models import FilterCondition, EventCondition, SegmentationRequest, UserField
 
-def generate_user_filter_sql(filter_condition: FilterCondition) -> str:
-    """Generate SQL for user attribute filters"""
+# Pydantic rejects unknown fields at parse time; this guards models built without validation
+VALID_USER_FIELDS = frozenset(get_args(UserField))
+
+# ENUM-typed columns (see database_setup.ENUM_TYPES). Binding their values as the ENUM
+# type lets DuckDB compare integer codes instead of casting every row to VARCHAR; TRY_CAST
+# turns labels outside the ENUM into NULL so they match nothing rather than erroring
+_ENUM_FIELD_TYPES: Dict[str, str] = {
+    "gender": "gender_enum",
+    "location": "location_enum",
+    "subscription_plan": "plan_enum",
+    "device_type": "device_enum",
+}
+_EVENT_NAME_PLACEHOLDER = "TRY_CAST(? AS event_enum)"
+
+def _placeholder(field: str) -> str:
+    enum_type = _ENUM_FIELD_TYPES.get(field)
+    return f"TRY_CAST(? AS {enum_type})" if enum_type else "?"
+
+def _comparison(sql_operator: str) -> Callable[[str, Any], Tuple[str, List[Any]]]:
+    return lambda field, value: (f"{field} {sql_operator} {_placeholder(field)}", [value])
+
+def _not_equal(field: str, value: Any) -> Tuple[str, List[Any]]:
+    if field in _ENUM_FIELD_TYPES:
+        # An unknown label binds as NULL; IS DISTINCT FROM still keeps every row
+        return f"{field} IS DISTINCT FROM {_placeholder(field)}", [value]
+    return f"{field} != ?", [value]
+
+def _membership(operator: str, negate: bool) -> Callable[[str, Any], Tuple[str, List[Any]]]:
+    def emit(field: str, value: Any) -> Tuple[str, List[Any]]:
+        if not isinstance(value, list):
+            raise ValueError(f"'{operator}' operator requires a list of values")
+        # "IN ()" is a syntax error; an empty list matches nothing (IN) or everything (NOT IN)
+        if not value:
+            return ("TRUE" if negate else "FALSE"), []
+        placeholders = ", ".join([_placeholder(field)] * len(value))
+        if not negate:
+            return f"{field} IN ({placeholders})", list(value)
+        if field in _ENUM_FIELD_TYPES:
+            # A NULL from an unknown label would make NOT IN reject every row
+            return f"({field} IN ({placeholders})) IS NOT TRUE", list(value)
+        return f"{field} NOT IN ({placeholders})", list(value)
+    return emit
+
+# Operator -> SQL emitter, looked up once per filter instead of walking an if/elif chain
+_USER_FILTER_EMITTERS: Dict[str, Callable[[str, Any], Tuple[str, List[Any]]]] = {
+    "eq": _comparison("="),
+    "ne": _not_equal,
+    "gt": _comparison(">"),
+    "gte": _comparison(">="),
+    "lt": _comparison("<"),
+    "lte": _comparison("<="),
+    "in": _membership("in", negate=False),
+    "not_in": _membership("not_in", negate=True),
+    "like": lambda field, value: (f"{field} LIKE ?", [f"%{value}%"]),
+}
+
+_EVENT_COUNT_OPERATORS: Dict[str, str] = {
+    "eq": "=",
+    "ne": "!=",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+}
+
+def generate_user_filter_sql(filter_condition: FilterCondition) -> Tuple[str, List[Any]]:
+    """Generate parameterized SQL for user attribute filters"""
     field = filter_condition.field
     operator = filter_condition.operator
     value = filter_condition.value
     
     # Validate field names to prevent SQL injection
-    valid_user_fields = ['user_id', 'name', 'age', 'gender', 'location', 'signup_date', 'subscription_plan', 'device_type']
-    if field not in valid_user_fields:
+    if field not in VALID_USER_FIELDS:
         raise ValueError(f"Invalid field: {field}")
     
-    if isinstance(value, str):
-        value = value.replace("'", "''")
-    elif isinstance(value, list):
-        value = [v.replace("'", "''") if isinstance(v, str) else v for v in value]
-    
-    if operator == "eq":
-        return f"{field} = '{value}'" if isinstance(value, str) else f"{field} = {value}"
-    elif operator == "ne":
-        return f"{field} != '{value}'" if isinstance(value, str) else f"{field} != {value}"
-    elif operator == "gt":
-        return f"{field} > {value}"
-    elif operator == "gte":
-        return f"{field} >= {value}"
-    elif operator == "lt":
-        return f"{field} < {value}"
-    elif operator == "lte":
-        return f"{field} <= {value}"
-    elif operator == "in":
-        if isinstance(value, list):
-            value_list = "', '".join(map(str, value)) if all(isinstance(v, str) for v in value) else ", ".join(map(str, value))
-            return f"{field} IN ('{value_list}')" if all(isinstance(v, str) for v in value) else f"{field} IN ({value_list})"
-        raise ValueError("'in' operator requires a list of values")
-    elif operator == "not_in":
-        if isinstance(value, list):
-            value_list = "', '".join(map(str, value)) if all(isinstance(v, str) for v in value) else ", ".join(map(str, value))
-            return f"{field} NOT IN ('{value_list}')" if all(isinstance(v, str) for v in value) else f"{field} NOT IN ({value_list})"
-        raise ValueError("'not_in' operator requires a list of values")
-    elif operator == "like":
-        return f"{field} LIKE '%{value}%'"
-    else:
+    emit = _USER_FILTER_EMITTERS.get(operator)
+    if emit is None:
         raise ValueError(f"Unsupported operator: {operator}")
+    
+    return emit(field, value)
 
-def generate_event_filter_sql(event_condition: EventCondition) -> str:
-    """Generate SQL for event-based filters"""
-    event_name = event_condition.event_name.replace("'", "''")
+def generate_event_counts_cte(count_keys: List[Tuple[str, Optional[int]]]) -> Tuple[str, List[Any]]:
+    """Generate a CTE that counts every requested event per user in a single pass"""
+    columns = []
+    params: List[Any] = []
+    
+    # Lifetime counts are precomputed at ingest; time windows need the raw events
+    use_summary = all(not time_range_days for _, time_range_days in count_keys)
+    
+    for index, (event_name, time_range_days) in enumerate(count_keys):
+        if use_summary:
+            columns.append(f"SUM(cnt) FILTER (WHERE event_name = {_EVENT_NAME_PLACEHOLDER}) AS c_{index}")
+            params.append(event_name)
+            continue
+        
+        time_filter = ""
+        if time_range_days:
+            time_filter = " AND timestamp >= CURRENT_DATE - INTERVAL (?) DAY"
+        columns.append(f"COUNT(*) FILTER (WHERE event_name = {_EVENT_NAME_PLACEHOLDER}{time_filter}) AS c_{index}")
+        params.append(event_name)
+        if time_range_days:
+            params.append(time_range_days)
+    
+    # Only scan events that some filter actually asks about
+    event_names = list(dict.fromkeys(event_name for event_name, _ in count_keys))
+    placeholders = ", ".join([_EVENT_NAME_PLACEHOLDER] * len(event_names))
+    params.extend(event_names)
+    
+    source_table = "user_event_counts" if use_summary else "user_events"
+    cte = f"""
+        ev AS (
+            SELECT user_id, {", ".join(columns)}
+            FROM {source_table}
+            WHERE event_name IN ({placeholders})
+            GROUP BY user_id
+        )
+    """
+    return cte, params
+
+def generate_event_filter_sql(event_condition: EventCondition, count_column: str) -> Tuple[str, List[Any]]:
+    """Generate parameterized SQL for event-based filters against a pre-aggregated count column"""
     operator = event_condition.operator
     count = event_condition.count
-    time_range_days = event_condition.time_range_days
-    
-    # Base event count subquery
-    time_filter = ""
-    if time_range_days:
-        time_filter = f"AND timestamp >= CURRENT_DATE - INTERVAL '{time_range_days}' DAY"
-    
-    count_subquery = f"""
-        (SELECT COUNT(*) FROM user_events ue2 
-         WHERE ue2.user_id = ua.user_id 
-         AND ue2.event_name = '{event_name}' 
-         {time_filter})
-    """
     
-    if operator == "eq":
-        return f"{count_subquery} = {count}"
-    elif operator == "ne":
-        return f"{count_subquery} != {count}"
-    elif operator == "gt":
-        return f"{count_subquery} > {count}"
-    elif operator == "gte":
-        return f"{count_subquery} >= {count}"
-    elif operator == "lt":
-        return f"{count_subquery} < {count}"
-    elif operator == "lte":
-        return f"{count_subquery} <= {count}"
-    else:
+    sql_operator = _EVENT_COUNT_OPERATORS.get(operator)
+    if sql_operator is None:
         raise ValueError(f"Unsupported event operator: {operator}")
+    
+    # Users without any matching events are absent from the CTE
+    return f"COALESCE(ev.{count_column}, 0) {sql_operator} ?", [count]
 
-def build_segmentation_query(request: SegmentationRequest) -> str:
-    """Build complete SQL query from segmentation request"""
+def build_segmentation_query(request: SegmentationRequest) -> Tuple[str, List[Any]]:
+    """Build complete parameterized SQL query from segmentation request"""
     where_conditions = []
+    params: List[Any] = []
     
     # Add user attribute filters
     for user_filter in request.user_filters:
-        condition_sql = generate_user_filter_sql(user_filter)
+        condition_sql, condition_params = generate_user_filter_sql(user_filter)
         where_conditions.append(f"({condition_sql})")
+        params.extend(condition_params)
     
-    # Add event filters
+    # Add event filters, sharing one count column per distinct (event, time range)
+    count_keys: List[Tuple[str, Optional[int]]] = []
     for event_filter in request.event_filters:
-        condition_sql = generate_event_filter_sql(event_filter)
+        count_key = (event_filter.event_name, event_filter.time_range_days or None)
+        if count_key not in count_keys:
+            count_keys.append(count_key)
+        condition_sql, condition_params = generate_event_filter_sql(
+            event_filter, f"c_{count_keys.index(count_key)}"
+        )
         where_conditions.append(f"({condition_sql})")
+        params.extend(condition_params)
     
     # Combine conditions
     if where_conditions:
@@ -99,15 +162,31 @@ def build_segmentation_query(request: SegmentationRequest) -> str:
     else:
         where_clause = ""
     
+    # Aggregate user_events once instead of a correlated subquery per event filter
+    with_clause = ""
+    event_join = ""
+    if count_keys:
+        cte_sql, cte_params = generate_event_counts_cte(count_keys)
+        with_clause = f"WITH {cte_sql}"
+        event_join = "LEFT JOIN ev ON ev.user_id = ua.user_id"
+        params = cte_params + params
+    
     # Build final query
     query = f"""
-        SELECT DISTINCT ua.user_id
+        {with_clause}
+        SELECT ua.user_id
         FROM user_attributes ua
+        {event_join}
         {where_clause}
-        ORDER BY ua.user_id
     """
     
+    # ev holds one row per user, so no DISTINCT is needed. Sorting is opt-in;
+    # without it DuckDB can stop scanning as soon as LIMIT is met
+    if request.order:
+        query += " ORDER BY ua.user_id"
+    
     if request.limit:
-        query += f" LIMIT {request.limit}"
+        query += " LIMIT ?"
+        params.append(request.limit)
     
-    return query
+    return query, params
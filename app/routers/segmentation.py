@@ -1,3 +1,4 @@
+import anyio
 from fastapi import APIRouter, HTTPException
 from ..models import SegmentationRequest, SegmentationResponse
 from ..database import get_db_connection
@@ -5,31 +6,36 @@ from ..query_builder import build_segmentation_query
 
 router = APIRouter()
 
+def run_segmentation_query(query, params):
+    """Execute a segmentation query on a per-request cursor of the shared connection"""
+    cursor = get_db_connection()
+    try:
+        return cursor.execute(query, params).to_arrow_table()
+    finally:
+        cursor.close()
+
 @router.post("/segment", response_model=SegmentationResponse)
-def segment_users(request: SegmentationRequest):
+async def segment_users(request: SegmentationRequest):
     """
     Segment users based on attribute and event filters
     """
     try:
         # Generate SQL query
-        query = build_segmentation_query(request)
+        query, params = build_segmentation_query(request)
         
-        # Execute query
-        conn = get_db_connection()
-        result = conn.execute(query).fetchall()
-        conn.close()
+        # Run only the blocking DuckDB call in a worker thread to keep the event loop free
+        result = await anyio.to_thread.run_sync(run_segmentation_query, query, params)
         
-        # Extract user IDs
-        user_ids = [row[0] for row in result]
+        # Extract user IDs straight from the Arrow column, skipping per-row tuples
+        user_ids = result.column('user_id').to_pylist()
         
         return SegmentationResponse(
             user_ids=user_ids,
             total_count=len(user_ids),
-            filters_applied={
-                "user_filters": [filter.model_dump() for filter in request.user_filters],
-                "event_filters": [filter.model_dump() for filter in request.event_filters],
-                "logic_operator": request.logic_operator
-            }
+            filters_applied=request.model_dump(
+                mode='json',
+                include={'user_filters', 'event_filters', 'logic_operator'}
+            )
         )
         
     except Exception as e:
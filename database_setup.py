@@ -1,21 +1,46 @@
 import duckdb
-import pandas as pd
 import os
 
+# Allowed values for the ENUM columns; generate_dummy_data.py draws from the same lists
+GENDERS = ['Male', 'Female', 'Other']
+LOCATIONS = [
+    'California', 'New York', 'Texas', 'Florida', 'Illinois',
+    'Pennsylvania', 'Ohio', 'Georgia', 'North Carolina', 'Michigan'
+]
+SUBSCRIPTION_PLANS = ['Basic', 'Premium', 'Enterprise', 'Free']
+DEVICE_TYPES = ['Desktop', 'Mobile', 'Tablet']
+EVENT_NAMES = [
+    'LOGIN', 'LOGOUT', 'PURCHASE_MADE', 'ADDED_TO_CART', 'REMOVED_FROM_CART',
+    'VIEW_PRODUCT', 'SEARCH', 'PROFILE_UPDATE', 'PASSWORD_CHANGE', 'EMAIL_OPENED'
+]
+
+ENUM_TYPES = {
+    'event_enum': EVENT_NAMES,
+    'gender_enum': GENDERS,
+    'location_enum': LOCATIONS,
+    'plan_enum': SUBSCRIPTION_PLANS,
+    'device_enum': DEVICE_TYPES,
+}
+
 def create_database_schema(conn):
     """Create the database schema for user attributes and events"""
     
+    # Store low-cardinality columns as ENUMs (small integer codes) instead of VARCHAR
+    for type_name, values in ENUM_TYPES.items():
+        labels = ", ".join(f"'{value}'" for value in values)
+        conn.execute(f"CREATE TYPE IF NOT EXISTS {type_name} AS ENUM ({labels})")
+    
     # Create user_attributes table
     conn.execute("""
         CREATE TABLE IF NOT EXISTS user_attributes (
             user_id INTEGER PRIMARY KEY,
             name VARCHAR,
             age INTEGER,
-            gender VARCHAR,
-            location VARCHAR,
+            gender gender_enum,
+            location location_enum,
             signup_date DATE,
-            subscription_plan VARCHAR,
-            device_type VARCHAR
+            subscription_plan plan_enum,
+            device_type device_enum
         )
     """)
     
@@ -23,17 +48,23 @@ def create_database_schema(conn):
     conn.execute("""
         CREATE TABLE IF NOT EXISTS user_events (
             user_id INTEGER,
-            event_name VARCHAR,
+            event_name event_enum,
             timestamp TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES user_attributes(user_id)
         )
     """)
     
+    # DuckDB's planner scans user_events sequentially for our event filters, so ART
+    # indexes there only slow down loads; the table is clustered instead (see cluster_user_events)
+    conn.execute("DROP INDEX IF EXISTS idx_user_events_user_id")
+    conn.execute("DROP INDEX IF EXISTS idx_user_events_event_name")
+    conn.execute("DROP INDEX IF EXISTS idx_ue_user_event")
+    conn.execute("DROP INDEX IF EXISTS idx_ue_event_user")
+    conn.execute("DROP INDEX IF EXISTS idx_user_attributes_location")
+    
     # Create index for better query performance
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_user_events_user_id ON user_events(user_id)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_user_events_event_name ON user_events(event_name)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_user_attributes_age ON user_attributes(age)")
-    conn.execute("CREATE INDEX IF NOT EXISTS idx_user_attributes_location ON user_attributes(location)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_ua_location_user ON user_attributes(location, user_id)")
     
     print("Database schema created successfully")
 
@@ -45,13 +76,16 @@ def load_csv_data(conn, csv_file, table_name):
         return False
     
     try:
-        # Read CSV using pandas
-        df = pd.read_csv(csv_file)
-        
-        # Convert DataFrame to DuckDB table
         conn.execute(f"DELETE FROM {table_name}")  # Clear existing data
-        conn.register('temp_df', df)
-        conn.execute(f"INSERT INTO {table_name} SELECT * FROM temp_df")
+        
+        # COPY is DuckDB's native bulk-load path for CSV files
+        conn.execute(f"""
+            COPY {table_name} FROM '{csv_file}' (
+                HEADER TRUE,
+                DATEFORMAT '%Y-%m-%d',
+                TIMESTAMPFORMAT '%Y-%m-%d %H:%M:%S'
+            )
+        """)
         
         row_count = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
         print(f"Loaded {row_count} rows into {table_name}")
@@ -61,6 +95,58 @@ def load_csv_data(conn, csv_file, table_name):
         print(f"Error loading {csv_file}: {str(e)}")
         return False
 
+def load_parquet_data(conn, parquet_file, table_name):
+    """Load Parquet data into DuckDB table"""
+    
+    if not os.path.exists(parquet_file):
+        print(f"Error: {parquet_file} not found!")
+        return False
+    
+    try:
+        conn.execute(f"DELETE FROM {table_name}")  # Clear existing data
+        
+        # Columnar, compressed input that DuckDB decodes in parallel
+        conn.execute(f"INSERT INTO {table_name} SELECT * FROM read_parquet('{parquet_file}')")
+        
+        row_count = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+        print(f"Loaded {row_count} rows into {table_name}")
+        return True
+        
+    except Exception as e:
+        print(f"Error loading {parquet_file}: {str(e)}")
+        return False
+
+def cluster_user_events(conn):
+    """Rewrite user_events sorted by (event_name, user_id) so zone maps can skip row groups"""
+    
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute("""
+            CREATE OR REPLACE TEMP TABLE user_events_sorted AS
+            SELECT * FROM user_events ORDER BY event_name, user_id
+        """)
+        conn.execute("DELETE FROM user_events")
+        conn.execute("INSERT INTO user_events SELECT * FROM user_events_sorted")
+        conn.execute("DROP TABLE user_events_sorted")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+def refresh_event_counts(conn):
+    """Rebuild the per-user event count summary used by the segmentation API"""
+    
+    conn.execute("""
+        CREATE OR REPLACE TABLE user_event_counts AS
+        SELECT user_id, event_name, COUNT(*) AS cnt, MAX(timestamp) AS last_ts
+        FROM user_events
+        GROUP BY user_id, event_name
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_uec_user_event ON user_event_counts(user_id, event_name)")
+    
+    row_count = conn.execute("SELECT COUNT(*) FROM user_event_counts").fetchone()[0]
+    print(f"Built user_event_counts with {row_count} rows")
+
 def verify_data_load(conn):
     """Verify that data was loaded correctly"""
     
@@ -93,10 +179,16 @@ def main():
         
         # Load data
         print("\nLoading data...")
-        user_success = load_csv_data(conn, 'user_attributes.csv', 'user_attributes')
-        event_success = load_csv_data(conn, 'user_events.csv', 'user_events')
+        if os.path.exists('user_attributes.parquet') and os.path.exists('user_events.parquet'):
+            user_success = load_parquet_data(conn, 'user_attributes.parquet', 'user_attributes')
+            event_success = load_parquet_data(conn, 'user_events.parquet', 'user_events')
+        else:
+            user_success = load_csv_data(conn, 'user_attributes.csv', 'user_attributes')
+            event_success = load_csv_data(conn, 'user_events.csv', 'user_events')
         
         if user_success and event_success:
+            cluster_user_events(conn)
+            refresh_event_counts(conn)
             print("\nData loading completed successfully!")
             verify_data_load(conn)
         else:
@@ -1,57 +1,122 @@
+import argparse
 import csv
-import random
-from datetime import datetime, timedelta
-from faker import Faker
+from itertools import islice
 
-fake = Faker()
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-def generate_user_attributes(num_users=10000):
-    """Generate dummy user attributes data"""
-    
-    subscription_plans = ['Basic', 'Premium', 'Enterprise', 'Free']
-    device_types = ['Desktop', 'Mobile', 'Tablet']
-    locations = ['California', 'New York', 'Texas', 'Florida', 'Illinois', 'Pennsylvania', 'Ohio', 'Georgia', 'North Carolina', 'Michigan']
+from database_setup import (
+    DEVICE_TYPES,
+    EVENT_NAMES,
+    GENDERS,
+    LOCATIONS,
+    SUBSCRIPTION_PLANS,
+    cluster_user_events,
+    create_database_schema,
+    refresh_event_counts,
+)
+
+rng = np.random.default_rng()
+
+FIRST_NAMES = np.array([
+    'James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda',
+    'William', 'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica',
+    'Thomas', 'Sarah', 'Charles', 'Karen', 'Daniel', 'Nancy', 'Matthew', 'Lisa'
+])
+LAST_NAMES = np.array([
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+    'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas',
+    'Taylor', 'Moore', 'Jackson', 'Martin', 'Lee', 'Perez', 'Thompson', 'White'
+])
+
+# Explicit Arrow schemas: real DATE/TIMESTAMP columns and dictionary-encoded
+# low-cardinality strings, matching the ENUM columns they load into
+LOW_CARDINALITY = pa.dictionary(pa.int8(), pa.string())
+USER_ATTRIBUTES_SCHEMA = pa.schema([
+    ('user_id', pa.int32()),
+    ('name', pa.string()),
+    ('age', pa.int32()),
+    ('gender', LOW_CARDINALITY),
+    ('location', LOW_CARDINALITY),
+    ('signup_date', pa.date32()),
+    ('subscription_plan', LOW_CARDINALITY),
+    ('device_type', LOW_CARDINALITY),
+])
+USER_EVENTS_SCHEMA = pa.schema([
+    ('user_id', pa.int32()),
+    ('event_name', LOW_CARDINALITY),
+    ('timestamp', pa.timestamp('s')),
+])
+
+def generate_user_attributes(num_users=10000, chunk_size=10000):
+    """Generate dummy user attributes data, yielding one row at a time"""
     
-    users = []
-    for i in range(1, num_users + 1):
+    # Draw columns in fixed-size chunks so memory stays flat however many users are requested
+    for first_id in range(1, num_users + 1, chunk_size):
+        size = min(chunk_size, num_users - first_id + 1)
+        
+        # Draw every column in one vectorized call instead of once per row
+        ages = rng.integers(18, 71, size)
+        genders = np.array(GENDERS)[rng.integers(0, len(GENDERS), size)]
+        user_locations = np.array(LOCATIONS)[rng.integers(0, len(LOCATIONS), size)]
+        plans = np.array(SUBSCRIPTION_PLANS)[rng.integers(0, len(SUBSCRIPTION_PLANS), size)]
+        devices = np.array(DEVICE_TYPES)[rng.integers(0, len(DEVICE_TYPES), size)]
+        
         # Generate signup date between 2 years ago and now
-        signup_date = fake.date_between(start_date='-2y', end_date='today')
+        base_date = np.datetime64('today', 'D') - np.timedelta64(730, 'D')
+        signup_dates = base_date + rng.integers(0, 731, size).astype('timedelta64[D]')
         
-        user = {
-            'user_id': i,
-            'name': fake.name(),
-            'age': random.randint(18, 70),
-            'gender': random.choice(['Male', 'Female', 'Other']),
-            'location': random.choice(locations),
-            'signup_date': signup_date.strftime('%Y-%m-%d'),
-            'subscription_plan': random.choice(subscription_plans),
-            'device_type': random.choice(device_types)
-        }
-        users.append(user)
-    
-    return users
+        # Synthetic names from small lists; Faker's provider lookup dominated the runtime
+        first_names = rng.choice(FIRST_NAMES, size).tolist()
+        last_names = rng.choice(LAST_NAMES, size).tolist()
+        
+        for user_id, first, last, age, gender, location, signup_date, plan, device in zip(
+            range(first_id, first_id + size),
+            first_names,
+            last_names,
+            ages.tolist(),
+            genders.tolist(),
+            user_locations.tolist(),
+            signup_dates.tolist(),
+            plans.tolist(),
+            devices.tolist()
+        ):
+            yield {
+                'user_id': user_id,
+                'name': f"{first} {last}",
+                'age': age,
+                'gender': gender,
+                'location': location,
+                'signup_date': signup_date,
+                'subscription_plan': plan,
+                'device_type': device
+            }
 
-def generate_user_events(user_ids, num_events=50000):
-    """Generate dummy user events data"""
+def generate_user_events(user_ids, num_events=50000, chunk_size=10000):
+    """Generate dummy user events data, yielding one row at a time"""
     
-    event_names = [
-        'LOGIN', 'LOGOUT', 'PURCHASE_MADE', 'ADDED_TO_CART', 'REMOVED_FROM_CART',
-        'VIEW_PRODUCT', 'SEARCH', 'PROFILE_UPDATE', 'PASSWORD_CHANGE', 'EMAIL_OPENED'
-    ]
+    uid_arr = np.asarray(user_ids)
+    event_arr = np.array(EVENT_NAMES)
     
-    events = []
-    for i in range(num_events):
+    for start in range(0, num_events, chunk_size):
+        size = min(chunk_size, num_events - start)
+        
+        # Sample ids, events and timestamps for the whole chunk in C
+        chosen_uids = rng.choice(uid_arr, size=size).tolist()
+        chosen_events = rng.choice(event_arr, size=size).tolist()
+        
         # Generate timestamp between 1 year ago and now
-        timestamp = fake.date_time_between(start_date='-1y', end_date='now')
+        base = np.datetime64('now', 's') - np.timedelta64(365, 'D')
+        timestamps = base + rng.integers(0, 365 * 86400, size=size).astype('timedelta64[s]')
         
-        event = {
-            'user_id': random.choice(user_ids),
-            'event_name': random.choice(event_names),
-            'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S')
-        }
-        events.append(event)
-    
-    return events
+        for user_id, event_name, timestamp in zip(chosen_uids, chosen_events, timestamps.tolist()):
+            yield {
+                'user_id': user_id,
+                'event_name': event_name,
+                'timestamp': timestamp
+            }
 
 def save_to_csv(data, filename, fieldnames):
     """Save data to CSV file"""
@@ -60,15 +125,79 @@ def save_to_csv(data, filename, fieldnames):
         writer.writeheader()
         writer.writerows(data)
 
-if __name__ == "__main__":
+def save_to_parquet(data, filename, schema, batch_size=10000):
+    """Save data to a zstd-compressed Parquet file, one row group per batch"""
+    rows = iter(data)
+    with pq.ParquetWriter(filename, schema, compression='zstd') as writer:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+def save_to_duckdb(conn, data, table_name, schema, batch_size=10000):
+    """Append data directly into a DuckDB table in batches"""
+    rows = iter(data)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        # DuckDB scans the Arrow batch in place; no pandas DataFrame in between
+        conn.register('batch', pa.Table.from_pylist(batch, schema=schema))
+        try:
+            conn.execute(f"INSERT INTO {table_name} SELECT * FROM batch")
+        finally:
+            conn.unregister('batch')
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate dummy DuckMart data")
+    parser.add_argument(
+        '--direct',
+        action='store_true',
+        help="Append rows straight into duckmart.db instead of writing files"
+    )
+    parser.add_argument(
+        '--format',
+        choices=['parquet', 'csv'],
+        default='parquet',
+        help="Output file format (default: parquet)"
+    )
+    args = parser.parse_args()
+    
     print("Generating dummy data...")
     
-    # Generate user attributes
-    users = generate_user_attributes(10000)
-    user_ids = [user['user_id'] for user in users]
+    num_users = 10000
+    num_events = 50000
     
-    # Generate user events
-    events = generate_user_events(user_ids, 50000)
+    # Rows are generated lazily and streamed into the chosen sink
+    users = generate_user_attributes(num_users)
+    events = generate_user_events(range(1, num_users + 1), num_events)
+    
+    if args.direct:
+        # Skip the file intermediate and load into DuckDB directly
+        conn = duckdb.connect('duckmart.db')
+        try:
+            create_database_schema(conn)
+            conn.execute("DELETE FROM user_events")  # Clear existing data
+            conn.execute("DELETE FROM user_attributes")
+            save_to_duckdb(conn, users, 'user_attributes', USER_ATTRIBUTES_SCHEMA)
+            save_to_duckdb(conn, events, 'user_events', USER_EVENTS_SCHEMA)
+            cluster_user_events(conn)
+            refresh_event_counts(conn)
+        finally:
+            conn.close()
+        
+        print(f"Generated {num_users} users and {num_events} events")
+        print("Data loaded into duckmart.db")
+        return
+    
+    if args.format == 'parquet':
+        save_to_parquet(users, 'user_attributes.parquet', USER_ATTRIBUTES_SCHEMA)
+        save_to_parquet(events, 'user_events.parquet', USER_EVENTS_SCHEMA)
+        
+        print(f"Generated {num_users} users and {num_events} events")
+        print("Files saved: user_attributes.parquet, user_events.parquet")
+        return
     
     # Save to CSV files
     save_to_csv(
@@ -83,5 +212,8 @@ if __name__ == "__main__":
         ['user_id', 'event_name', 'timestamp']
     )
     
-    print(f"Generated {len(users)} users and {len(events)} events")
-    print("Files saved: user_attributes.csv, user_events.csv")
\ No newline at end of file
+    print(f"Generated {num_users} users and {num_events} events")
+    print("Files saved: user_attributes.csv, user_events.csv")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,5 +1,7 @@
 import uvicorn
-from app.main import app
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Run a single process: DuckDB already spreads each query across all cores and the
+    # endpoint runs queries on worker threads. Extra workers would each open their own
+    # DuckDB instance with its own thread pool and memory limit.
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000)
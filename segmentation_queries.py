@@ -1,4 +1,5 @@
 import duckdb
+import numpy as np
 
 def run_age_segmentation(conn):
     """Segment users by age group (25-34 years)"""
@@ -10,33 +11,38 @@ def run_age_segmentation(conn):
     ORDER BY user_id
     """
     
-    result = conn.execute(query).fetchall()
-    user_ids = [row[0] for row in result]
+    # NumPy columns avoid building a Python tuple per row
+    result = conn.execute(query).fetchnumpy()
+    user_ids = result['user_id']
     
     print(f"Age-based segmentation (25-34 years):")
-    print(f"Total users in segment: {len(result)}")
-    print(f"User IDs: {user_ids[:20]}...")  # Show first 20 IDs
+    print(f"Total users in segment: {len(user_ids)}")
+    print(f"User IDs: {user_ids[:20].tolist()}...")  # Show first 20 IDs
     
     return user_ids
 
 def run_location_event_segmentation(conn):
     """Segment users by location='California' and have logged in at least once"""
     
+    # Semi-join: stop looking at a user's events after the first LOGIN
     query = """
-    SELECT DISTINCT ua.user_id, ua.name, ua.location
+    SELECT ua.user_id, ua.name, ua.location
     FROM user_attributes ua
-    INNER JOIN user_events ue ON ua.user_id = ue.user_id
     WHERE ua.location = 'California' 
-    AND ue.event_name = 'LOGIN'
+    AND EXISTS (
+        SELECT 1 FROM user_events ue
+        WHERE ue.user_id = ua.user_id AND ue.event_name = 'LOGIN'
+    )
     ORDER BY ua.user_id
     """
     
-    result = conn.execute(query).fetchall()
-    user_ids = [row[0] for row in result]
+    # NumPy columns avoid building a Python tuple per row
+    result = conn.execute(query).fetchnumpy()
+    user_ids = result['user_id']
     
     print(f"\nLocation + Event segmentation (California + LOGIN):")
-    print(f"Total users in segment: {len(result)}")
-    print(f"User IDs: {user_ids[:20]}...")  # Show first 20 IDs
+    print(f"Total users in segment: {len(user_ids)}")
+    print(f"User IDs: {user_ids[:20].tolist()}...")  # Show first 20 IDs
     
     return user_ids
 
@@ -79,8 +85,8 @@ def analyze_segments(conn):
         print(f"Total LOGIN events by CA users: {stats[1]}")
 
 def main():
-    # Connect to the existing DuckDB database
-    conn = duckdb.connect('duckmart.db')
+    # Connect to the existing DuckDB database (read-only so it can run alongside the API)
+    conn = duckdb.connect('duckmart.db', read_only=True)
     
     try:
         print("Running segmentation queries...")
@@ -93,15 +99,11 @@ def main():
         analyze_segments(conn)
         
         # Save results to files for reference
-        with open('age_segment_users.txt', 'w') as f:
-            f.write("Users in age group 25-34:\n")
-            f.write(str(age_segment_users))
+        # Binary int32 arrays; load back with np.load
+        np.save('age_segment_users.npy', np.asarray(age_segment_users, dtype=np.int32))
+        np.save('location_event_users.npy', np.asarray(location_event_users, dtype=np.int32))
         
-        with open('location_event_users.txt', 'w') as f:
-            f.write("California users who have logged in:\n")
-            f.write(str(location_event_users))
-        
-        print(f"\nResults saved to age_segment_users.txt and location_event_users.txt")
+        print(f"\nResults saved to age_segment_users.npy and location_event_users.npy")
         
     except Exception as e:
         print(f"Query execution failed: {str(e)}")
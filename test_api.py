@@ -1,4 +1,5 @@
-import requests
+import asyncio
+import httpx
 import json
 
 def test_segmentation_api():
@@ -55,24 +56,30 @@ def test_segmentation_api():
     print("Testing Segmentation API...")
     print("=" * 50)
     
-    for test_case in test_cases:
+    async def run_test_cases():
+        # Fire all test cases concurrently over one pooled keep-alive client
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            return await asyncio.gather(
+                *(client.post("/segment", json=test_case['payload']) for test_case in test_cases),
+                return_exceptions=True
+            )
+    
+    responses = asyncio.run(run_test_cases())
+    
+    for test_case, response in zip(test_cases, responses):
         print(f"\nTest: {test_case['name']}")
         print(f"Payload: {json.dumps(test_case['payload'], indent=2)}")
         
-        try:
-            response = requests.post(f"{base_url}/segment", json=test_case['payload'])
-            
-            if response.status_code == 200:
-                result = response.json()
-                print(f"✅ Success: Found {result['total_count']} users")
-                print(f"Sample user IDs: {result['user_ids'][:10]}...")
-            else:
-                print(f"❌ Failed: {response.status_code} - {response.text}")
-                
-        except requests.exceptions.ConnectionError:
+        if isinstance(response, httpx.ConnectError):
             print("❌ Connection failed - Make sure the API server is running")
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
+        elif isinstance(response, Exception):
+            print(f"❌ Error: {str(response)}")
+        elif response.status_code == 200:
+            result = response.json()
+            print(f"✅ Success: Found {result['total_count']} users")
+            print(f"Sample user IDs: {result['user_ids'][:10]}...")
+        else:
+            print(f"❌ Failed: {response.status_code} - {response.text}")
         
         print("-" * 30)
 
@@ -80,7 +87,7 @@ def get_api_examples():
     """Get example payloads from the API"""
     
     try:
-        response = requests.get("http://localhost:8000/examples")
+        response = httpx.get("http://localhost:8000/examples")
         if response.status_code == 200:
             examples = response.json()
             print("\nAPI Examples:")
@@ -8,7 +8,8 @@ def validate_database():
     print("🔍 Validating database setup...")
     
     try:
-        conn = duckdb.connect('duckmart.db')
+        # Read-only so validation can run while the API server holds the database
+        conn = duckdb.connect('duckmart.db', read_only=True)
         
         # Check table existence and row counts
         user_count = conn.execute("SELECT COUNT(*) FROM user_attributes").fetchone()[0]
@@ -25,10 +26,12 @@ def validate_database():
         """).fetchone()[0]
         
         ca_login_segment = conn.execute("""
-            SELECT COUNT(DISTINCT ua.user_id)
+            SELECT COUNT(*)
             FROM user_attributes ua
-            INNER JOIN user_events ue ON ua.user_id = ue.user_id
-            WHERE ua.location = 'California' AND ue.event_name = 'LOGIN'
+            WHERE ua.location = 'California' AND EXISTS (
+                SELECT 1 FROM user_events ue
+                WHERE ue.user_id = ua.user_id AND ue.event_name = 'LOGIN'
+            )
         """).fetchone()[0]
         
         print(f"   - Age segment (25-34): {age_segment} users")